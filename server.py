@@ -9,17 +9,22 @@ The server communicates with the Reachy Mini daemon running on localhost:8000.
 This version uses a repository-based approach for defining tools dynamically.
 """
 
-import httpx
 import json
 import os
-import math
 import asyncio
-import importlib.util
-from pathlib import Path
 from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 from tts_queue import AsyncTTSQueue
+from server_common import (
+    REACHY_BASE_URL,
+    TOOLS_REPOSITORY_PATH,
+    create_head_pose,
+    load_script_module,
+    load_tool_definition,
+    load_tool_index,
+    make_request,
+)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -27,118 +32,28 @@ load_dotenv()
 # Initialize FastMCP server
 mcp = FastMCP("Reachy Mini Controller")
 
-# Configuration
-REACHY_BASE_URL = os.getenv("REACHY_BASE_URL", "http://localhost:8000")
-TOOLS_REPOSITORY_PATH = Path(__file__).parent / "tools_repository"
-
 # TTS Queue (initialized in initialize_server)
 tts_queue = None
 
+# Cap on concurrent tool executions when operate_robot runs a sequence
+# with parallel=True. The daemon can only service so many requests at
+# once; bounding here keeps it responsive even if a sequence lists more
+# commands than that.
+MAX_PARALLEL_TOOLS = int(os.environ.get("MAX_PARALLEL_TOOLS", "4"))
 
-# Helper functions
-def create_head_pose(
-    x: float = 0.0,
-    y: float = 0.0, 
-    z: float = 0.0,
-    roll: float = 0.0,
-    pitch: float = 0.0,
-    yaw: float = 0.0,
-    degrees: bool = False,
-    mm: bool = False
-) -> Dict[str, Any]:
-    """
-    Create a head pose configuration for Reachy Mini.
-    
-    Args:
-        x, y, z: Position offsets (meters by default, mm if mm=True)
-        roll, pitch, yaw: Rotation angles (radians by default, degrees if degrees=True)
-        degrees: If True, angles are in degrees
-        mm: If True, positions are in millimeters
-    
-    Returns:
-        Dictionary with head pose configuration
-    """
-    if mm:
-        x, y, z = x / 1000, y / 1000, z / 1000
-    
-    if degrees:
-        roll = math.radians(roll)
-        pitch = math.radians(pitch)
-        yaw = math.radians(yaw)
-    
-    return {
-        "x": x,
-        "y": y,
-        "z": z,
-        "roll": roll,
-        "pitch": pitch,
-        "yaw": yaw
-    }
+_parallel_tools_sem: Optional[asyncio.Semaphore] = None
 
 
-async def make_request(
-    method: str,
-    endpoint: str,
-    json_data: Optional[Dict] = None,
-    params: Optional[Dict] = None
-) -> Dict[str, Any]:
-    """Make an HTTP request to the Reachy Mini daemon."""
-    url = f"{REACHY_BASE_URL}{endpoint}"
-    
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            if method.upper() == "GET":
-                response = await client.get(url, params=params)
-            elif method.upper() == "POST":
-                response = await client.post(url, json=json_data)
-            elif method.upper() == "PUT":
-                response = await client.put(url, json=json_data)
-            elif method.upper() == "DELETE":
-                response = await client.delete(url)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            response.raise_for_status()
-            return response.json() if response.content else {"status": "success"}
-            
-        except httpx.HTTPError as e:
-            return {"error": str(e), "status": "failed"}
+def _get_parallel_tools_sem() -> asyncio.Semaphore:
+    """Get the shared semaphore bounding parallel tool execution."""
+    global _parallel_tools_sem
+    if _parallel_tools_sem is None:
+        _parallel_tools_sem = asyncio.Semaphore(MAX_PARALLEL_TOOLS)
+    return _parallel_tools_sem
 
 
 # Dynamic tool loading functions
 
-def load_tool_index() -> Dict[str, Any]:
-    """Load the tool index from tools_index.json."""
-    index_path = TOOLS_REPOSITORY_PATH / "tools_index.json"
-    if not index_path.exists():
-        raise FileNotFoundError(f"Tool index not found at {index_path}")
-    
-    with open(index_path, 'r') as f:
-        return json.load(f)
-
-
-def load_tool_definition(definition_file: str) -> Dict[str, Any]:
-    """Load a tool definition from a JSON file."""
-    def_path = TOOLS_REPOSITORY_PATH / definition_file
-    if not def_path.exists():
-        raise FileNotFoundError(f"Tool definition not found at {def_path}")
-    
-    with open(def_path, 'r') as f:
-        return json.load(f)
-
-
-def load_script_module(script_file: str):
-    """Dynamically load a Python script as a module."""
-    script_path = TOOLS_REPOSITORY_PATH / "scripts" / script_file
-    if not script_path.exists():
-        raise FileNotFoundError(f"Script not found at {script_path}")
-    
-    spec = importlib.util.spec_from_file_location("tool_script", script_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
-
 def create_tool_function(tool_def: Dict[str, Any]):
     """Create a tool function from a tool definition."""
     import inspect
@@ -208,6 +123,10 @@ def register_tools_from_repository():
     try:
         index = load_tool_index()
         
+        # Collect the per-tool report and emit it in one write instead of
+        # flushing stdout once per tool
+        report = []
+        
         for tool_entry in index.get("tools", []):
             # Skip disabled tools
             if not tool_entry.get("enabled", True):
@@ -231,15 +150,16 @@ def register_tools_from_repository():
                 # Individual tools are NOT registered as MCP tools - only operate_robot is exposed
                 register_tool_to_registry(tool_name, tool_func)
                 
-                print(f"✓ Loaded tool to registry: {tool_name}")
+                report.append(f"✓ Loaded tool to registry: {tool_name}")
                 
             except Exception as e:
                 import traceback
-                print(f"✗ Failed to register tool {tool_name}: {e}")
-                print(f"  Traceback: {traceback.format_exc()}")
+                report.append(f"✗ Failed to register tool {tool_name}: {e}")
+                report.append(f"  Traceback: {traceback.format_exc()}")
         
-        print(f"\n✓ Successfully loaded {len([t for t in index.get('tools', []) if t.get('enabled', True)])} tools to registry")
-        print(f"✓ Tool registry contains {len(TOOL_REGISTRY)} tools available for operate_robot")
+        report.append(f"\n✓ Successfully loaded {len([t for t in index.get('tools', []) if t.get('enabled', True)])} tools to registry")
+        report.append(f"✓ Tool registry contains {len(TOOL_REGISTRY)} tools available for operate_robot")
+        print("\n".join(report))
         
     except Exception as e:
         print(f"✗ Failed to load tools from repository: {e}")
@@ -338,7 +258,11 @@ Antenna Limits:
 Command Sequences:
 - Commands in a sequence are executed sequentially
 - Each command waits for the previous one to complete
+- parallel=True runs commands concurrently - only use it for independent
+  commands (e.g. state queries), never for ordered movements
 - If a command fails, subsequent commands will still be attempted
+- Repeating a command identical to one that already failed in the same
+  sequence is skipped (status "skipped") instead of re-executed
 - Check the results array to see which commands succeeded or failed
 """
 
@@ -346,9 +270,23 @@ Command Sequences:
 # Tool registry for dynamic tool execution
 TOOL_REGISTRY = {}
 
+# Cached comma-separated tool listing for error messages. The registry is
+# fixed after startup, so the sorted join only needs to happen once.
+_available_tools_cache = None
+
 def register_tool_to_registry(tool_name: str, tool_func):
     """Register a tool in the global registry for dynamic execution."""
+    global _available_tools_cache
     TOOL_REGISTRY[tool_name] = tool_func
+    _available_tools_cache = None
+
+
+def get_available_tools_description() -> str:
+    """Get a comma-separated listing of registered tool names."""
+    global _available_tools_cache
+    if _available_tools_cache is None:
+        _available_tools_cache = ", ".join(sorted(TOOL_REGISTRY.keys()))
+    return _available_tools_cache
 
 
 def get_tool_registry() -> Dict[str, Any]:
@@ -360,12 +298,18 @@ def get_tool_registry() -> Dict[str, Any]:
     return TOOL_REGISTRY
 
 
+# Sentinel marking a sequence command that was skipped because an
+# identical command already failed earlier in the same sequence
+_SKIPPED = object()
+
+
 # Meta-tool for operating the robot dynamically
 # Note: This is registered manually in initialize_server() after all tools are loaded
 async def operate_robot(
     tool_name: Optional[str] = None, 
     parameters: Optional[Dict[str, Any]] = None,
-    commands: Optional[List[Dict[str, Any]]] = None
+    commands: Optional[List[Dict[str, Any]]] = None,
+    parallel: Optional[bool] = False
 ) -> Dict[str, Any]:
     """
     Execute robot control tool(s) dynamically based on tools_index.json.
@@ -403,6 +347,9 @@ async def operate_robot(
         commands: List of command dictionaries for sequence mode. Each dict should have:
                   - "tool_name": Name of the tool to execute
                   - "parameters": Dictionary of parameters (optional)
+        parallel: If True, sequence commands run concurrently instead of one
+                  after another. Only use for independent commands (e.g. state
+                  queries); movement commands usually need sequential order.
     
     Returns:
         For single command: Result from the executed tool
@@ -440,6 +387,7 @@ async def operate_robot(
         
         results = []
         failed_count = 0
+        pending = []
         
         for idx, command in enumerate(commands):
             if not isinstance(command, dict):
@@ -465,7 +413,7 @@ async def operate_robot(
             
             # Check if tool exists
             if cmd_tool_name not in registry:
-                available_tools = ", ".join(sorted(registry.keys()))
+                available_tools = get_available_tools_description()
                 results.append({
                     "command_index": idx,
                     "tool_name": cmd_tool_name,
@@ -476,26 +424,75 @@ async def operate_robot(
                 failed_count += 1
                 continue
             
-            # Execute the command
-            try:
-                tool_func = registry[cmd_tool_name]
-                result = await tool_func(**cmd_parameters)
+            # Queue the command for execution
+            pending.append((idx, cmd_tool_name, cmd_parameters))
+
+        # Execute the validated commands - concurrently when parallel is
+        # requested, otherwise one at a time in order. Parallel execution
+        # is bounded so a long command list cannot flood the daemon.
+        if parallel:
+            sem = _get_parallel_tools_sem()
+
+            async def run_bounded(func, params):
+                async with sem:
+                    return await func(**params)
+
+            outcomes = await asyncio.gather(
+                *(run_bounded(registry[name], params) for _, name, params in pending),
+                return_exceptions=True
+            )
+        else:
+            outcomes = []
+            # Fingerprints of commands that already failed in this
+            # sequence. Re-running the exact same command cannot succeed
+            # and just burns daemon round-trips, so identical retries are
+            # skipped instead of executed.
+            failed_fingerprints = set()
+            for _, name, params in pending:
+                fingerprint = (name, json.dumps(params, sort_keys=True, default=str))
+                if fingerprint in failed_fingerprints:
+                    outcomes.append(_SKIPPED)
+                    continue
+                try:
+                    outcome = await registry[name](**params)
+                except Exception as e:
+                    failed_fingerprints.add(fingerprint)
+                    outcomes.append(e)
+                else:
+                    if isinstance(outcome, dict) and outcome.get("status") == "failed":
+                        failed_fingerprints.add(fingerprint)
+                    outcomes.append(outcome)
+
+        for (idx, name, params), outcome in zip(pending, outcomes):
+            if outcome is _SKIPPED:
                 results.append({
                     "command_index": idx,
-                    "tool": cmd_tool_name,
-                    "parameters": cmd_parameters,
-                    "result": result,
-                    "status": "success"
+                    "tool": name,
+                    "parameters": params,
+                    "error": "Skipped: identical command already failed earlier in this sequence",
+                    "status": "skipped"
                 })
-            except Exception as e:
+                failed_count += 1
+            elif isinstance(outcome, Exception):
                 results.append({
                     "command_index": idx,
-                    "tool": cmd_tool_name,
-                    "parameters": cmd_parameters,
-                    "error": str(e),
+                    "tool": name,
+                    "parameters": params,
+                    "error": str(outcome),
                     "status": "failed"
                 })
                 failed_count += 1
+            else:
+                results.append({
+                    "command_index": idx,
+                    "tool": name,
+                    "parameters": params,
+                    "result": outcome,
+                    "status": "success"
+                })
+
+        # Keep results in command order (validation failures were appended first)
+        results.sort(key=lambda r: r["command_index"])
         
         # Automatically append get_robot_state at the end
         try:
@@ -536,7 +533,7 @@ async def operate_robot(
         
         # Check if tool exists in registry
         if tool_name not in registry:
-            available_tools = ", ".join(sorted(registry.keys()))
+            available_tools = get_available_tools_description()
             return {
                 "error": f"Tool '{tool_name}' not found",
                 "available_tools": available_tools,
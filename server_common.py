@@ -0,0 +1,187 @@
+"""
+Shared helpers for the Reachy Mini servers.
+
+Both server.py (MCP) and server_openai.py (OpenAI-compatible API) talk to
+the same daemon and load tools from the same repository. This module holds
+the pieces they previously duplicated: the daemon HTTP client, the head
+pose helper, and the tool repository loaders. Optimizations only need to
+be applied once here instead of twice.
+"""
+
+import json
+import math
+import asyncio
+import importlib.util
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+import httpx
+
+# Optional orjson for faster JSON parsing (falls back to stdlib json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data):
+    """Parse JSON using orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Configuration
+REACHY_BASE_URL = os.getenv("REACHY_BASE_URL", "http://localhost:8000")
+TOOLS_REPOSITORY_PATH = Path(__file__).parent / "tools_repository"
+
+# Retry policy for daemon requests that fail before reaching the daemon
+MAX_REQUEST_RETRIES = 2
+RETRY_BACKOFF_SECONDS = 0.25
+
+# HTTP methods make_request accepts
+SUPPORTED_METHODS = frozenset({"GET", "POST", "PUT", "DELETE"})
+
+# Shared HTTP client for daemon requests (created lazily, reused for the
+# lifetime of the server so connections to the daemon are kept alive)
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=8),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client if it was created."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+# Helper functions
+
+def create_head_pose(
+    x: float = 0.0,
+    y: float = 0.0,
+    z: float = 0.0,
+    roll: float = 0.0,
+    pitch: float = 0.0,
+    yaw: float = 0.0,
+    degrees: bool = False,
+    mm: bool = False
+) -> Dict[str, Any]:
+    """
+    Create a head pose configuration for Reachy Mini.
+
+    Args:
+        x, y, z: Position offsets (meters by default, mm if mm=True)
+        roll, pitch, yaw: Rotation angles (radians by default, degrees if degrees=True)
+        degrees: If True, angles are in degrees
+        mm: If True, positions are in millimeters
+
+    Returns:
+        Dictionary with head pose configuration
+    """
+    if mm:
+        x, y, z = x / 1000, y / 1000, z / 1000
+
+    if degrees:
+        roll = math.radians(roll)
+        pitch = math.radians(pitch)
+        yaw = math.radians(yaw)
+
+    return {
+        "x": x,
+        "y": y,
+        "z": z,
+        "roll": roll,
+        "pitch": pitch,
+        "yaw": yaw
+    }
+
+
+async def make_request(
+    method: str,
+    endpoint: str,
+    json_data: Optional[Dict] = None,
+    params: Optional[Dict] = None
+) -> Dict[str, Any]:
+    """
+    Make an HTTP request to the Reachy Mini daemon.
+
+    Connection failures (daemon not reachable yet) are retried a couple of
+    times with a short backoff before giving up. Requests that reached the
+    daemon are never retried, so commands cannot run twice.
+    """
+    url = f"{REACHY_BASE_URL}{endpoint}"
+    client = get_http_client()
+
+    method = method.upper()
+    if method not in SUPPORTED_METHODS:
+        raise ValueError(f"Unsupported HTTP method: {method}")
+
+    for attempt in range(MAX_REQUEST_RETRIES + 1):
+        try:
+            if method == "GET":
+                response = await client.get(url, params=params)
+            else:
+                response = await client.request(method, url, json=json_data)
+
+            response.raise_for_status()
+            return response.json() if response.content else {"status": "success"}
+
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            if attempt == MAX_REQUEST_RETRIES:
+                return {"error": str(e), "status": "failed"}
+            await asyncio.sleep(RETRY_BACKOFF_SECONDS * (2 ** attempt))
+        except httpx.HTTPError as e:
+            return {"error": str(e), "status": "failed"}
+
+
+# Dynamic tool loading functions
+
+@lru_cache(maxsize=64)
+def _read_json_file(path_str: str, mtime_ns: int) -> Dict[str, Any]:
+    """Read and parse a JSON file, cached on path + modification time."""
+    with open(path_str, 'rb') as f:
+        return json_loads(f.read())
+
+
+def load_tool_index() -> Dict[str, Any]:
+    """Load the tool index from tools_index.json."""
+    index_path = TOOLS_REPOSITORY_PATH / "tools_index.json"
+    if not index_path.exists():
+        raise FileNotFoundError(f"Tool index not found at {index_path}")
+
+    return _read_json_file(str(index_path), index_path.stat().st_mtime_ns)
+
+
+def load_tool_definition(definition_file: str) -> Dict[str, Any]:
+    """Load a tool definition from a JSON file."""
+    def_path = TOOLS_REPOSITORY_PATH / definition_file
+    if not def_path.exists():
+        raise FileNotFoundError(f"Tool definition not found at {def_path}")
+
+    return _read_json_file(str(def_path), def_path.stat().st_mtime_ns)
+
+
+def load_script_module(script_file: str):
+    """Dynamically load a Python script as a module."""
+    script_path = TOOLS_REPOSITORY_PATH / "scripts" / script_file
+    if not script_path.exists():
+        raise FileNotFoundError(f"Script not found at {script_path}")
+
+    spec = importlib.util.spec_from_file_location("tool_script", script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
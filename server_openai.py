@@ -12,13 +12,9 @@ The server communicates with the Reachy Mini daemon running on localhost:8000.
 This version uses a repository-based approach for defining tools dynamically.
 """
 
-import httpx
 import json
 import os
-import math
 import asyncio
-import importlib.util
-from pathlib import Path
 from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException
@@ -26,6 +22,17 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from tts_queue import AsyncTTSQueue
 import uvicorn
+from server_common import (
+    REACHY_BASE_URL,
+    TOOLS_REPOSITORY_PATH,
+    close_http_client,
+    create_head_pose,
+    get_http_client,
+    load_script_module,
+    load_tool_definition,
+    load_tool_index,
+    make_request,
+)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -37,16 +44,27 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Configuration
-REACHY_BASE_URL = "http://localhost:8000"
-TOOLS_REPOSITORY_PATH = Path(__file__).parent / "tools_repository"
-
 # TTS Queue (initialized in startup)
 tts_queue = None
 
 # Tool registry
 TOOL_REGISTRY = {}
 
+# OpenAI-format tool list, built once at registration time. The registry
+# never changes after startup, so /tools and chat completions can serve
+# this cached list instead of re-converting every definition per request.
+OPENAI_TOOLS: List[Dict[str, Any]] = []
+
+
+# Static usage stub shared by every chat completion response. This server
+# does not run a model itself, so token counts are always zero; build the
+# dict once instead of per response.
+USAGE_STUB = {
+    "prompt_tokens": 0,
+    "completion_tokens": 0,
+    "total_tokens": 0
+}
+
 
 # Pydantic models for API
 
@@ -75,100 +93,8 @@ class ChatCompletionRequest(BaseModel):
     max_tokens: Optional[int] = Field(3000, description="Maximum tokens to generate")
 
 
-# Helper functions
-
-def create_head_pose(
-    x: float = 0.0,
-    y: float = 0.0, 
-    z: float = 0.0,
-    roll: float = 0.0,
-    pitch: float = 0.0,
-    yaw: float = 0.0,
-    degrees: bool = False,
-    mm: bool = False
-) -> Dict[str, Any]:
-    """Create a head pose configuration for Reachy Mini."""
-    if mm:
-        x, y, z = x / 1000, y / 1000, z / 1000
-    
-    if degrees:
-        roll = math.radians(roll)
-        pitch = math.radians(pitch)
-        yaw = math.radians(yaw)
-    
-    return {
-        "x": x,
-        "y": y,
-        "z": z,
-        "roll": roll,
-        "pitch": pitch,
-        "yaw": yaw
-    }
-
-
-async def make_request(
-    method: str,
-    endpoint: str,
-    json_data: Optional[Dict] = None,
-    params: Optional[Dict] = None
-) -> Dict[str, Any]:
-    """Make an HTTP request to the Reachy Mini daemon."""
-    url = f"{REACHY_BASE_URL}{endpoint}"
-    
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            if method.upper() == "GET":
-                response = await client.get(url, params=params)
-            elif method.upper() == "POST":
-                response = await client.post(url, json=json_data)
-            elif method.upper() == "PUT":
-                response = await client.put(url, json=json_data)
-            elif method.upper() == "DELETE":
-                response = await client.delete(url)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            response.raise_for_status()
-            return response.json() if response.content else {"status": "success"}
-            
-        except httpx.HTTPError as e:
-            return {"error": str(e), "status": "failed"}
-
-
 # Dynamic tool loading functions
 
-def load_tool_index() -> Dict[str, Any]:
-    """Load the tool index from tools_index.json."""
-    index_path = TOOLS_REPOSITORY_PATH / "tools_index.json"
-    if not index_path.exists():
-        raise FileNotFoundError(f"Tool index not found at {index_path}")
-    
-    with open(index_path, 'r') as f:
-        return json.load(f)
-
-
-def load_tool_definition(definition_file: str) -> Dict[str, Any]:
-    """Load a tool definition from a JSON file."""
-    def_path = TOOLS_REPOSITORY_PATH / definition_file
-    if not def_path.exists():
-        raise FileNotFoundError(f"Tool definition not found at {def_path}")
-    
-    with open(def_path, 'r') as f:
-        return json.load(f)
-
-
-def load_script_module(script_file: str):
-    """Dynamically load a Python script as a module."""
-    script_path = TOOLS_REPOSITORY_PATH / "scripts" / script_file
-    if not script_path.exists():
-        raise FileNotFoundError(f"Script not found at {script_path}")
-    
-    spec = importlib.util.spec_from_file_location("tool_script", script_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
-
 def convert_tool_to_openai_format(tool_def: Dict[str, Any]) -> Dict[str, Any]:
     """Convert tool definition to OpenAI function calling format."""
     # Build parameters schema
@@ -234,6 +160,10 @@ def register_tools_from_repository():
         index = load_tool_index()
         openai_tools = []
         
+        # Collect the per-tool report and emit it in one write instead of
+        # flushing stdout once per tool
+        report = []
+        
         for tool_entry in index.get("tools", []):
             # Skip disabled tools
             if not tool_entry.get("enabled", True):
@@ -255,18 +185,20 @@ def register_tools_from_repository():
                     "definition": tool_def
                 }
                 
-                # Convert to OpenAI format
+                # Convert to OpenAI format and cache for reuse
                 openai_tool = convert_tool_to_openai_format(tool_def)
                 openai_tools.append(openai_tool)
-                
-                print(f"✓ Loaded tool: {tool_name}")
+                OPENAI_TOOLS.append(openai_tool)
+
+                report.append(f"✓ Loaded tool: {tool_name}")
                 
             except Exception as e:
                 import traceback
-                print(f"✗ Failed to register tool {tool_name}: {e}")
-                print(f"  Traceback: {traceback.format_exc()}")
+                report.append(f"✗ Failed to register tool {tool_name}: {e}")
+                report.append(f"  Traceback: {traceback.format_exc()}")
         
-        print(f"\n✓ Successfully loaded {len(openai_tools)} tools")
+        report.append(f"\n✓ Successfully loaded {len(openai_tools)} tools")
+        print("\n".join(report))
         return openai_tools
         
     except Exception as e:
@@ -293,13 +225,7 @@ async def root():
 @app.get("/tools")
 async def get_tools():
     """Get all available tools in OpenAI format."""
-    tools = []
-    for tool_name, tool_data in TOOL_REGISTRY.items():
-        tool_def = tool_data["definition"]
-        openai_tool = convert_tool_to_openai_format(tool_def)
-        tools.append(openai_tool)
-    
-    return {"tools": tools}
+    return {"tools": OPENAI_TOOLS}
 
 
 @app.post("/execute_tool")
@@ -333,17 +259,20 @@ async def chat_completions(request: ChatCompletionRequest):
     This endpoint processes chat messages and can execute tools when requested.
     It mimics OpenAI's API behavior for tool calling.
     """
-    messages = [msg.dict(exclude_none=True) for msg in request.messages]
-    
-    # Get the last user message
+    # Get the last user message - scan the parsed models directly instead of
+    # converting the whole history to dicts first
     last_user_message = None
-    for msg in reversed(messages):
-        if msg["role"] == "user":
-            last_user_message = msg["content"]
+    for msg in reversed(request.messages):
+        if msg.role == "user":
+            last_user_message = msg.content
             break
     
     if not last_user_message:
         raise HTTPException(status_code=400, detail="No user message found")
+
+    # One timestamp per response; the handler previously asked the event
+    # loop for the time once per id/created field
+    now = asyncio.get_running_loop().time()
     
     # Simple response generation (you can integrate with an actual LLM here)
     # For now, we'll check if the message requests a tool and execute it
@@ -368,12 +297,12 @@ async def chat_completions(request: ChatCompletionRequest):
         
         if selected_tool and selected_tool in TOOL_REGISTRY:
             # Create tool call response
-            tool_call_id = f"call_{asyncio.get_event_loop().time()}"
+            tool_call_id = f"call_{now}"
             
             response = {
-                "id": f"chatcmpl-{asyncio.get_event_loop().time()}",
+                "id": f"chatcmpl-{now}",
                 "object": "chat.completion",
-                "created": int(asyncio.get_event_loop().time()),
+                "created": int(now),
                 "model": request.model,
                 "choices": [{
                     "index": 0,
@@ -391,11 +320,7 @@ async def chat_completions(request: ChatCompletionRequest):
                     },
                     "finish_reason": "tool_calls"
                 }],
-                "usage": {
-                    "prompt_tokens": 0,
-                    "completion_tokens": 0,
-                    "total_tokens": 0
-                }
+                "usage": USAGE_STUB
             }
             
             return response
@@ -404,9 +329,9 @@ async def chat_completions(request: ChatCompletionRequest):
     response_text = "I'm a robot control assistant. I can help you control the Reachy Mini robot. What would you like me to do?"
     
     response = {
-        "id": f"chatcmpl-{asyncio.get_event_loop().time()}",
+        "id": f"chatcmpl-{now}",
         "object": "chat.completion",
-        "created": int(asyncio.get_event_loop().time()),
+        "created": int(now),
         "model": request.model,
         "choices": [{
             "index": 0,
@@ -416,11 +341,7 @@ async def chat_completions(request: ChatCompletionRequest):
             },
             "finish_reason": "stop"
         }],
-        "usage": {
-            "prompt_tokens": 0,
-            "completion_tokens": 0,
-            "total_tokens": 0
-        }
+        "usage": USAGE_STUB
     }
     
     return response
@@ -453,7 +374,15 @@ async def startup_event():
     
     # Register all tools from repository
     register_tools_from_repository()
-    
+
+    # Warm the daemon connection so the first command doesn't pay the TCP
+    # handshake. Best effort - the daemon may simply not be up yet.
+    try:
+        await get_http_client().get(f"{REACHY_BASE_URL}/", timeout=2.0)
+        print("✓ Daemon connection warmed up")
+    except Exception:
+        print("⚠️  Daemon not reachable yet; will connect on first command")
+
     print("=" * 60)
     print("Server initialized and ready!")
     print("=" * 60)
@@ -464,6 +393,7 @@ async def shutdown_event():
     """Cleanup on shutdown."""
     if tts_queue:
         tts_queue.cleanup()
+    await close_http_client()
     print("Server shutdown complete")
 
 
@@ -14,6 +14,7 @@ Requirements:
 """
 
 import asyncio
+import logging
 import re
 import subprocess
 import tempfile
@@ -28,6 +29,16 @@ from dotenv import load_dotenv
 # Load environment variables from .env file if available
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Matches text between "..." - compiled once since it runs on every response
+QUOTED_TEXT_PATTERN = re.compile(r'"([^"]*)"')
+
+
+def _shorten(text: str, limit: int = 50) -> str:
+    """Truncate text for log output, appending '...' when cut."""
+    return text if len(text) <= limit else f"{text[:limit]}..."
+
 
 class TTSQueue:
     """Manages text-to-speech conversion and playback queue."""
@@ -127,46 +138,45 @@ class TTSQueue:
     
     def _playback_worker(self):
         """Background worker that processes the audio queue."""
-        while not self.should_stop:
+        while True:
             try:
-                # Get next audio file from queue (with timeout to allow checking should_stop)
-                audio_file = self.audio_queue.get(timeout=0.5)
-                
-                if audio_file is None:  # Poison pill to stop
+                # Block until the next file arrives - cleanup() always
+                # sends the poison pill, so no polling timeout is needed
+                audio_file = self.audio_queue.get()
+
+                if audio_file is None or self.should_stop:  # Poison pill to stop
                     break
-                
+
                 # Play the audio file
                 self._play_audio(audio_file)
-                
+
                 # Clean up the temporary file
                 try:
                     os.unlink(audio_file)
                 except Exception as e:
-                    print(f"⚠️  Error deleting temp file {audio_file}: {e}")
-                
+                    logger.warning("⚠️  Error deleting temp file %s: %s", audio_file, e)
+
                 self.audio_queue.task_done()
-                
-            except Empty:
-                continue
+
             except Exception as e:
-                print(f"⚠️  Error in playback worker: {e}")
+                logger.warning("⚠️  Error in playback worker: %s", e)
     
     def _play_audio(self, audio_file: str):
         """Play an audio file using aplay."""
         try:
             self.is_playing = True
-            print(f"🔊 Playing audio: {audio_file}")
+            logger.debug("🔊 Playing audio: %s", audio_file)
             
             # Check if file exists and has content
             if not os.path.exists(audio_file):
-                print(f"⚠️  Audio file does not exist: {audio_file}")
+                logger.warning("⚠️  Audio file does not exist: %s", audio_file)
                 return
             
             file_size = os.path.getsize(audio_file)
-            print(f"   File size: {file_size} bytes")
+            logger.debug("   File size: %d bytes", file_size)
             
             if file_size == 0:
-                print(f"⚠️  Audio file is empty: {audio_file}")
+                logger.warning("⚠️  Audio file is empty: %s", audio_file)
                 return
             
             # Build aplay command
@@ -186,16 +196,16 @@ class TTSQueue:
             stdout, stderr = self.current_process.communicate()
             
             if self.current_process.returncode != 0:
-                print(f"⚠️  aplay returned error code: {self.current_process.returncode}")
+                logger.warning("⚠️  aplay returned error code: %s", self.current_process.returncode)
                 if stderr:
-                    print(f"   stderr: {stderr.decode('utf-8', errors='ignore')}")
+                    logger.warning("   stderr: %s", stderr.decode('utf-8', errors='ignore'))
             else:
-                print(f"   ✓ Playback completed")
+                logger.debug("   ✓ Playback completed")
             
             self.current_process = None
             
         except Exception as e:
-            print(f"⚠️  Error playing audio: {e}")
+            logger.warning("⚠️  Error playing audio: %s", e)
             import traceback
             traceback.print_exc()
         finally:
@@ -244,13 +254,13 @@ class TTSQueue:
             if result.returncode == 0 and os.path.exists(output_path):
                 return output_path
             else:
-                print(f"⚠️  piper conversion failed: {result.stderr.decode('utf-8', errors='ignore')}")
+                logger.warning("⚠️  piper conversion failed: %s", result.stderr.decode('utf-8', errors='ignore'))
                 if os.path.exists(output_path):
                     os.unlink(output_path)
                 return None
                 
         except Exception as e:
-            print(f"⚠️  Error in text_to_speech: {e}")
+            logger.warning("⚠️  Error in text_to_speech: %s", e)
             return None
     
     def extract_quoted_text(self, text: str) -> List[str]:
@@ -263,9 +273,12 @@ class TTSQueue:
         Returns:
             List of quoted text segments
         """
+        # Fast path: no quote character means no quoted segments
+        if '"' not in text:
+            return []
+
         # Find all text between "..."
-        pattern = r'"([^"]*)"'
-        matches = re.findall(pattern, text)
+        matches = QUOTED_TEXT_PATTERN.findall(text)
         return [match.strip() for match in matches if match.strip()]
     
     def enqueue_text(self, text: str):
@@ -286,7 +299,7 @@ class TTSQueue:
             else:
                 return
         
-        print(f"🔊 Enqueueing {len(quoted_texts)} TTS segment(s)...")
+        logger.debug("🔊 Enqueueing %d TTS segment(s)...", len(quoted_texts))
         
         for quoted_text in quoted_texts:
             # Convert to speech
@@ -295,7 +308,8 @@ class TTSQueue:
             if audio_file:
                 # Add to playback queue
                 self.audio_queue.put(audio_file)
-                print(f"   ✓ Queued: \"{quoted_text[:50]}...\"" if len(quoted_text) > 50 else f"   ✓ Queued: \"{quoted_text}\"")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug('   ✓ Queued: "%s"', _shorten(quoted_text))
     
     def clear_queue(self):
         """Clear all pending audio from the queue."""
@@ -325,17 +339,17 @@ class TTSQueue:
                     pass
             self.current_process = None
         
-        print("🔇 TTS queue cleared")
+        logger.debug("🔇 TTS queue cleared")
     
     def cleanup(self):
         """Clean up resources."""
-        # Stop playback thread
+        # Stop playback thread. Clear pending audio before sending the
+        # poison pill so clear_queue() cannot drain the pill and leave the
+        # worker blocked on an empty queue.
         self.should_stop = True
-        self.audio_queue.put(None)  # Poison pill
-        
-        # Clear any remaining audio
         self.clear_queue()
-        
+        self.audio_queue.put(None)  # Poison pill
+
         # Wait for thread to finish
         if self.playback_thread and self.playback_thread.is_alive():
             self.playback_thread.join(timeout=2)